@@ -3,14 +3,29 @@ Data Generator for PII NER Training
 Generates noisy STT-style transcripts with labeled PII entities.
 """
 
+import os
 import json
+import itertools
 import random
+import shutil
+import string
+import sys
 import argparse
-from typing import List, Dict, Tuple
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, List, Dict, Optional, Tuple
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional, only speeds up serialization
+    orjson = None
 
 # ============ DATA POOLS ============
 
-FIRST_NAMES = [
+FIRST_NAMES = (
     "rahul", "priya", "amit", "neha", "vijay", "anita", "rajesh", "sunita",
     "deepak", "pooja", "sanjay", "kavita", "arun", "meera", "suresh", "divya",
     "ramesh", "anjali", "rohit", "sneha", "manish", "rekha", "nikhil", "swati",
@@ -19,9 +34,9 @@ FIRST_NAMES = [
     "gaurav", "komal", "vishal", "archana", "mohit", "megha", "harsh", "jyoti",
     "dev", "simran", "aman", "tanya", "kunal", "ritika", "sahil", "kriti",
     "vivek", "manisha", "ajay", "sakshi"
-]
+)
 
-LAST_NAMES = [
+LAST_NAMES = (
     "sharma", "verma", "gupta", "singh", "kumar", "patel", "reddy", "rao",
     "iyer", "nair", "menon", "pillai", "joshi", "desai", "mehta", "shah",
     "chopra", "kapoor", "malhotra", "khanna", "bhatia", "agarwal", "saxena",
@@ -29,9 +44,9 @@ LAST_NAMES = [
     "banerjee", "mukherjee", "chatterjee", "ghosh", "das", "sen", "bose",
     "roy", "dutta", "paul", "sinha", "prasad", "krishnan", "subramanian",
     "chaudhary", "rathore", "rajput", "solanki", "parikh", "trivedi"
-]
+)
 
-CITIES = [
+CITIES = (
     "mumbai", "delhi", "bangalore", "hyderabad", "chennai", "kolkata", "pune",
     "ahmedabad", "jaipur", "lucknow", "kanpur", "nagpur", "indore", "thane",
     "bhopal", "visakhapatnam", "patna", "vadodara", "ghaziabad", "ludhiana",
@@ -40,9 +55,9 @@ CITIES = [
     "jabalpur", "gwalior", "vijayawada", "madurai", "guwahati", "chandigarh",
     "hubli", "mysore", "trichy", "bareilly", "aligarh", "moradabad", "gurgaon",
     "noida", "kochi", "trivandrum", "mangalore"
-]
+)
 
-LOCATIONS = [
+LOCATIONS = (
     "koramangala", "indiranagar", "whitefield", "electronic city", "hsr layout",
     "marathahalli", "jayanagar", "btm layout", "jp nagar", "banashankari",
     "bandra", "andheri", "powai", "worli", "juhu", "malad", "goregaon",
@@ -53,29 +68,66 @@ LOCATIONS = [
     "salt lake", "park street", "new town", "rajarhat", "howrah",
     "mg road", "brigade road", "church street", "residency road",
     "anna nagar", "t nagar", "adyar", "velachery", "omr", "ecr"
-]
+)
 
-EMAIL_DOMAINS = [
+EMAIL_DOMAINS = (
     "gmail.com", "yahoo.com", "hotmail.com", "outlook.com", "rediffmail.com",
     "gmail.co", "yahoo.co.in", "hotmail.co.in", "rediffmail.co.in",
     "protonmail.com", "protonmail.in", "icloud.com", "live.com",
     "gmail.in", "yahoo.in", "outlook.in"
-]
+)
+
+PHONE_STYLES = ("digits", "words", "mixed", "grouped", "double")
+CREDIT_CARD_STYLES = ("words", "mixed", "grouped", "digits")
+EMAIL_SPOKEN_STYLES = ("spoken", "mixed", "normal")
+EMAIL_ADDRESS_STYLES = ("dot", "underscore", "direct", "initial")
+# Indexed by month number; slot 0 is unused
+MONTHS = ("", "january", "february", "march", "april", "may", "june",
+          "july", "august", "september", "october", "november", "december")
+
+DATE_STYLES = ("dmy_slash", "dmy_dash", "spoken", "spoken_th", "d_of_month")
+
+# ============ BULK DRAWS ============
+
+class ShardDraws:
+    """Pool values drawn in bulk for a whole shard, indexed by sample position."""
+
+    def __init__(self, rng: random.Random, n: int):
+        self.first_names = rng.choices(FIRST_NAMES, k=n)
+        self.last_names = rng.choices(LAST_NAMES, k=n)
+        self.cities = rng.choices(CITIES, k=n)
+        self.locations = rng.choices(LOCATIONS, k=n)
+        
+        # Raw phone / card digits come from one vectorized draw each
+        digit_rng = np.random.default_rng(rng.getrandbits(64))
+        phones = np.empty((n, 10), dtype=np.uint8)
+        phones[:, 0] = digit_rng.integers(6, 10, n, dtype=np.uint8)  # Indian mobiles start with 6-9
+        phones[:, 1:] = digit_rng.integers(0, 10, (n, 9), dtype=np.uint8)
+        self.phones = _digit_rows(phones)
+        self.credit_cards = _digit_rows(digit_rng.integers(0, 10, (n, 16), dtype=np.uint8))
+
+def _digit_rows(digits: np.ndarray) -> List[str]:
+    """Turn an (n, width) array of 0-9 values into n digit strings."""
+    n, width = digits.shape
+    flat = (digits + ord("0")).tobytes().decode("ascii")
+    return [flat[j:j + width] for j in range(0, n * width, width)]
 
 # ============ HELPER FUNCTIONS ============
 
-def num_to_words(n: int) -> str:
-    """Convert a single digit to word."""
-    words = ["zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine"]
-    return words[n]
+_DIGIT_WORDS = ("zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine")
+_DIGIT_WORDS_BY_CHAR = dict(zip("0123456789", _DIGIT_WORDS))
+
+# Digit -> "word " table so a whole digit string is spelled out by one
+# str.translate call instead of a Python-level loop
+_SPOKEN_DIGITS = str.maketrans({d: w + " " for d, w in _DIGIT_WORDS_BY_CHAR.items()})
 
-def format_phone_spoken(digits: str) -> str:
+def format_phone_spoken(rng: random.Random, digits: str) -> str:
     """Format phone number in various STT styles."""
-    style = random.choice(["digits", "words", "mixed", "grouped", "double"])
+    style = rng.choice(PHONE_STYLES)
     
     if style == "digits":
         # Plain digits with optional spaces
-        if random.random() < 0.5:
+        if rng.random() < 0.5:
             return digits
         else:
             # Add space in middle
@@ -84,16 +136,16 @@ def format_phone_spoken(digits: str) -> str:
     
     elif style == "words":
         # All spoken words
-        return " ".join(num_to_words(int(d)) for d in digits)
+        return digits.translate(_SPOKEN_DIGITS)[:-1]
     
     elif style == "mixed":
         # Mix of digits and words
         result = []
         for d in digits:
-            if random.random() < 0.5:
+            if rng.random() < 0.5:
                 result.append(d)
             else:
-                result.append(num_to_words(int(d)))
+                result.append(_DIGIT_WORDS_BY_CHAR[d])
         return " ".join(result)
     
     elif style == "grouped":
@@ -108,29 +160,29 @@ def format_phone_spoken(digits: str) -> str:
         i = 0
         while i < len(digits):
             if i + 1 < len(digits) and digits[i] == digits[i+1]:
-                result.append(f"double {num_to_words(int(digits[i]))}")
+                result.append(f"double {_DIGIT_WORDS_BY_CHAR[digits[i]]}")
                 i += 2
             else:
-                if random.random() < 0.5:
-                    result.append(num_to_words(int(digits[i])))
+                if rng.random() < 0.5:
+                    result.append(_DIGIT_WORDS_BY_CHAR[digits[i]])
                 else:
                     result.append(digits[i])
                 i += 1
         return " ".join(result)
 
-def format_credit_card_spoken(digits: str) -> str:
+def format_credit_card_spoken(rng: random.Random, digits: str) -> str:
     """Format credit card in various STT styles."""
-    style = random.choice(["words", "mixed", "grouped", "digits"])
+    style = rng.choice(CREDIT_CARD_STYLES)
     
     if style == "words":
-        return " ".join(num_to_words(int(d)) for d in digits)
+        return digits.translate(_SPOKEN_DIGITS)[:-1]
     elif style == "mixed":
         result = []
         for d in digits:
-            if random.random() < 0.4:
+            if rng.random() < 0.4:
                 result.append(d)
             else:
-                result.append(num_to_words(int(d)))
+                result.append(_DIGIT_WORDS_BY_CHAR[d])
         return " ".join(result)
     elif style == "grouped":
         # Group as 4-4-4-4
@@ -139,62 +191,52 @@ def format_credit_card_spoken(digits: str) -> str:
     else:
         return digits
 
-def format_email_spoken(email: str) -> str:
+# Translate tables keyed by (speak "@", speak ".")
+_EMAIL_SPOKEN_TABLES = {
+    (spoken_at, spoken_dot): str.maketrans(
+        {**({"@": " at "} if spoken_at else {}), **({".": " dot "} if spoken_dot else {})}
+    )
+    for spoken_at in (False, True)
+    for spoken_dot in (False, True)
+}
+
+def format_email_spoken(rng: random.Random, email: str) -> str:
     """Format email in STT style."""
-    style = random.choice(["spoken", "mixed", "normal"])
+    style = rng.choice(EMAIL_SPOKEN_STYLES)
     
     if style == "normal":
         return email
     
-    # Replace @ and . with spoken forms
-    result = email
-    if random.random() < 0.7:
-        result = result.replace("@", " at ")
-    if random.random() < 0.6:
-        result = result.replace(".", " dot ")
-    
-    return result.strip()
+    # Replace @ and . with spoken forms in a single translate pass
+    spoken_at = rng.random() < 0.7
+    spoken_dot = rng.random() < 0.6
+    return email.translate(_EMAIL_SPOKEN_TABLES[spoken_at, spoken_dot]).strip()
 
-def format_date_spoken(day: int, month: int, year: int) -> str:
+# Ordinal suffix indexed by day of month (1st, 2nd, 3rd, 11th, 21st, ...)
+_ORDINAL_SUFFIX = tuple(
+    "th" if 11 <= d <= 13 else {1: "st", 2: "nd", 3: "rd"}.get(d % 10, "th")
+    for d in range(32)
+)
+
+def format_date_spoken(rng: random.Random, day: int, month: int, year: int) -> str:
     """Format date in various STT styles."""
-    months = ["january", "february", "march", "april", "may", "june",
-              "july", "august", "september", "october", "november", "december"]
-    
-    style = random.choice(["dmy_slash", "dmy_dash", "spoken", "spoken_th", "d_of_month"])
+    style = rng.choice(DATE_STYLES)
     
     if style == "dmy_slash":
         return f"{day:02d}/{month:02d}/{year}"
     elif style == "dmy_dash":
         return f"{day:02d}-{month:02d}-{year}"
     elif style == "spoken":
-        return f"{day} {months[month-1]} {year}"
+        return f"{day} {MONTHS[month]} {year}"
     elif style == "spoken_th":
-        suffix = "th"
-        if day == 1 or day == 21 or day == 31:
-            suffix = "st"
-        elif day == 2 or day == 22:
-            suffix = "nd"
-        elif day == 3 or day == 23:
-            suffix = "rd"
-        return f"{day}{suffix} {months[month-1]} {year}"
+        return f"{day}{_ORDINAL_SUFFIX[day]} {MONTHS[month]} {year}"
     else:
-        return f"{day} of {months[month-1]} {year}"
-
-def generate_phone() -> str:
-    """Generate Indian phone number."""
-    # Indian mobile numbers start with 6-9
-    first = random.choice(["6", "7", "8", "9"])
-    rest = "".join(random.choices("0123456789", k=9))
-    return first + rest
+        return f"{day} of {MONTHS[month]} {year}"
 
-def generate_credit_card() -> str:
-    """Generate 16-digit credit card number."""
-    return "".join(random.choices("0123456789", k=16))
-
-def generate_email(first_name: str, last_name: str) -> str:
+def generate_email(rng: random.Random, first_name: str, last_name: str) -> str:
     """Generate email from name."""
-    domain = random.choice(EMAIL_DOMAINS)
-    style = random.choice(["dot", "underscore", "direct", "initial"])
+    domain = rng.choice(EMAIL_DOMAINS)
+    style = rng.choice(EMAIL_ADDRESS_STYLES)
     
     if style == "dot":
         return f"{first_name}.{last_name}@{domain}"
@@ -205,372 +247,285 @@ def generate_email(first_name: str, last_name: str) -> str:
     else:
         return f"{first_name[0]}.{last_name}@{domain}"
 
-def generate_date() -> Tuple[int, int, int]:
+def generate_date(rng: random.Random) -> Tuple[int, int, int]:
     """Generate random date."""
-    year = random.randint(2023, 2027)
-    month = random.randint(1, 12)
-    day = random.randint(1, 28)
+    year = rng.randint(2023, 2027)
+    month = rng.randint(1, 12)
+    day = rng.randint(1, 28)
     return day, month, year
 
+# ============ TEMPLATES ============
+
+def compile_template(fmt: str) -> Tuple[Tuple[str, str], ...]:
+    """Split "... {LABEL} ..." into ("lit", text) and ("ent", LABEL) segments."""
+    segments = []
+    for literal, label, _, _ in string.Formatter().parse(fmt):
+        if literal:
+            segments.append(("lit", literal))
+        if label is not None:
+            segments.append(("ent", label))
+    return tuple(segments)
+
+@lru_cache(maxsize=None)
+def template_slots(template: Tuple[Tuple[str, str], ...]) -> frozenset:
+    """Entity labels a compiled template has slots for."""
+    return frozenset(segment for kind, segment in template if kind == "ent")
+
+def render_template(template: Tuple[Tuple[str, str], ...], values: Dict[str, str]) -> Tuple[str, List[Dict]]:
+    """Fill a compiled template, recording entity spans as the text is built."""
+    parts = []
+    entities = []
+    cursor = 0
+    for kind, segment in template:
+        if kind == "ent":
+            value = values[segment]
+            entities.append({"start": cursor, "end": cursor + len(value), "label": segment})
+            segment = value
+        parts.append(segment)
+        cursor += len(segment)
+    return "".join(parts), entities
+
+FULL_INFO_TEMPLATES = tuple(map(compile_template, [
+    "this is {PERSON_NAME} from {CITY} my phone is {PHONE} and email is {EMAIL} we can meet on {DATE}",
+    "my name is {PERSON_NAME} i am from {CITY} call me on {PHONE} or email {EMAIL} lets meet {DATE}",
+    "hi i am {PERSON_NAME} living in {CITY} my number is {PHONE} email {EMAIL} available on {DATE}",
+    "hello this is {PERSON_NAME} from {CITY} you can reach me at {PHONE} or {EMAIL} meeting on {DATE}",
+]))
+
+NAME_PHONE_TEMPLATES = tuple(map(compile_template, [
+    "this is {PERSON_NAME} my phone number is {PHONE} please call me tomorrow",
+    "my name is {PERSON_NAME} and my contact number is {PHONE}",
+    "i am {PERSON_NAME} you can call me on {PHONE}",
+    "hello {PERSON_NAME} here my mobile is {PHONE} call anytime",
+    "this is {PERSON_NAME} reach me at {PHONE} thanks",
+]))
+
+NAME_EMAIL_TEMPLATES = tuple(map(compile_template, [
+    "email id of {PERSON_NAME} is {EMAIL}",
+    "my name is {PERSON_NAME} and my email is {EMAIL}",
+    "i am {PERSON_NAME} please send mail to {EMAIL}",
+    "this is {PERSON_NAME} email me at {EMAIL}",
+    "contact {PERSON_NAME} at {EMAIL} for details",
+]))
+
+NAME_CITY_DATE_TEMPLATES = tuple(map(compile_template, [
+    "i am {PERSON_NAME} travelling to {CITY} on {DATE}",
+    "this is {PERSON_NAME} i will be in {CITY} on {DATE}",
+    "my name is {PERSON_NAME} booking flight to {CITY} for {DATE}",
+    "hello {PERSON_NAME} here need hotel in {CITY} on {DATE}",
+    "{PERSON_NAME} planning visit to {CITY} around {DATE}",
+]))
+
+CREDIT_CARD_TEMPLATES = tuple(map(compile_template, [
+    "my name is {PERSON_NAME} i am from {CITY} my credit card number is {CREDIT_CARD} and it expires on {DATE} you can email me on {EMAIL}",
+    "this is {PERSON_NAME} my card number is {CREDIT_CARD} expiry {DATE}",
+    "i am {PERSON_NAME} please charge card {CREDIT_CARD} thanks",
+    "hello {PERSON_NAME} here credit card {CREDIT_CARD} for payment",
+    "card details for {PERSON_NAME} number {CREDIT_CARD} valid till {DATE}",
+]))
+
+LOCATION_CITY_TEMPLATES = tuple(map(compile_template, [
+    "the office is near {LOCATION} in {CITY} today",
+    "i live in {LOCATION} area of {CITY}",
+    "our branch is at {LOCATION} in {CITY}",
+    "meeting point is {LOCATION} in {CITY} tomorrow",
+    "address is {LOCATION} {CITY} please note",
+]))
+
+NAME_LOCATION_CITY_TEMPLATES = tuple(map(compile_template, [
+    "my name is {PERSON_NAME} i work in {LOCATION} in {CITY}",
+    "this is {PERSON_NAME} from {LOCATION} area {CITY}",
+    "i am {PERSON_NAME} my office is in {LOCATION} {CITY}",
+    "hello {PERSON_NAME} here based in {LOCATION} near {CITY}",
+]))
+
+HINGLISH_TEMPLATES = tuple(map(compile_template, [
+    "haan so my naam is {PERSON_NAME} and main rehte in {CITY} we will meet on {DATE}",
+    "arey mera name {PERSON_NAME} hai aur main {CITY} mein hoon milte hain {DATE}",
+    "dekhiye {PERSON_NAME} bol raha hoon {CITY} se call kar raha hoon {DATE} ko milenge",
+    "hello ji {PERSON_NAME} this side from {CITY} lets connect on {DATE}",
+]))
+
+COMPLEX_CC_PHONE_EMAIL_TEMPLATES = tuple(map(compile_template, [
+    "uh actually my old card number maybe is {CREDIT_CARD} i am not sure and my new phone is {PHONE} also send email to {EMAIL} please",
+    "card number is {CREDIT_CARD} phone {PHONE} email {EMAIL} please process",
+    "details are card {CREDIT_CARD} mobile {PHONE} mail {EMAIL} thanks",
+]))
+
+NEGATIVE_PHRASES = (
+    "tomorrow problem delivery please information payment issue update balance complaint resolve checking plan status yesterday",
+    "complaint order tomorrow ticket feedback please support balance issue today",
+    "soon status fast help ticket plan problem service support please checking payment balance complaint tomorrow",
+    "yes i need help with my order it is delayed",
+    "please check my account balance and update status",
+    "i want to cancel my subscription immediately",
+    "when will my delivery arrive please update",
+    "the service is not working properly please help",
+    "i have a complaint about recent transaction",
+    "need to speak with customer support urgently",
+    "my package was damaged during shipping",
+    "please refund my money as soon as possible",
+    "the product quality is not as expected",
+    "i want to change my plan to premium",
+    "how do i reset my password please help",
+    "the app is crashing every time i open it",
+    "i need invoice for my recent purchase",
+    "when is the sale starting this month",
+    "please transfer me to billing department",
+    "i have been waiting for thirty minutes already",
+)
+
+# Plain format strings: only the chosen one gets formatted
+ORDER_ID_TEMPLATES = (
+    "this is regarding order id {order_id} and i checked it two three times already",
+    "my order number is {order_id} please check status",
+    "reference number {order_id} for complaint",
+    "ticket id {order_id} still not resolved",
+    "booking reference {order_id} please confirm",
+)
+
 # ============ TEMPLATE GENERATORS ============
 
-def gen_full_info() -> Dict:
+def gen_full_info(rng: random.Random, draws: ShardDraws, i: int) -> Tuple[str, List[Dict]]:
     """Generate: name + city + phone + email + date"""
-    first = random.choice(FIRST_NAMES)
-    last = random.choice(LAST_NAMES)
+    first = draws.first_names[i]
+    last = draws.last_names[i]
     name = f"{first} {last}"
-    city = random.choice(CITIES)
-    phone_raw = generate_phone()
-    phone = format_phone_spoken(phone_raw)
-    email_raw = generate_email(first, last)
-    email = format_email_spoken(email_raw)
-    day, month, year = generate_date()
-    date = format_date_spoken(day, month, year)
-    
-    templates = [
-        f"this is {name} from {city} my phone is {phone} and email is {email} we can meet on {date}",
-        f"my name is {name} i am from {city} call me on {phone} or email {email} lets meet {date}",
-        f"hi i am {name} living in {city} my number is {phone} email {email} available on {date}",
-        f"hello this is {name} from {city} you can reach me at {phone} or {email} meeting on {date}",
-    ]
-    
-    text = random.choice(templates)
-    entities = []
-    
-    # Find spans
-    name_start = text.find(name)
-    if name_start >= 0:
-        entities.append({"start": name_start, "end": name_start + len(name), "label": "PERSON_NAME"})
-    
-    city_start = text.find(city)
-    if city_start >= 0:
-        entities.append({"start": city_start, "end": city_start + len(city), "label": "CITY"})
-    
-    phone_start = text.find(phone)
-    if phone_start >= 0:
-        entities.append({"start": phone_start, "end": phone_start + len(phone), "label": "PHONE"})
-    
-    email_start = text.find(email)
-    if email_start >= 0:
-        entities.append({"start": email_start, "end": email_start + len(email), "label": "EMAIL"})
-    
-    date_start = text.find(date)
-    if date_start >= 0:
-        entities.append({"start": date_start, "end": date_start + len(date), "label": "DATE"})
-    
-    return {"text": text, "entities": entities}
-
-def gen_name_phone() -> Dict:
+    city = draws.cities[i]
+    phone_raw = draws.phones[i]
+    phone = format_phone_spoken(rng, phone_raw)
+    email_raw = generate_email(rng, first, last)
+    email = format_email_spoken(rng, email_raw)
+    day, month, year = generate_date(rng)
+    date = format_date_spoken(rng, day, month, year)
+    
+    return render_template(rng.choice(FULL_INFO_TEMPLATES), {
+        "PERSON_NAME": name, "CITY": city, "PHONE": phone, "EMAIL": email, "DATE": date,
+    })
+
+def gen_name_phone(rng: random.Random, draws: ShardDraws, i: int) -> Tuple[str, List[Dict]]:
     """Generate: name + phone"""
-    first = random.choice(FIRST_NAMES)
-    last = random.choice(LAST_NAMES)
+    first = draws.first_names[i]
+    last = draws.last_names[i]
     name = f"{first} {last}"
-    phone_raw = generate_phone()
-    phone = format_phone_spoken(phone_raw)
-    
-    templates = [
-        f"this is {name} my phone number is {phone} please call me tomorrow",
-        f"my name is {name} and my contact number is {phone}",
-        f"i am {name} you can call me on {phone}",
-        f"hello {name} here my mobile is {phone} call anytime",
-        f"this is {name} reach me at {phone} thanks",
-    ]
+    phone_raw = draws.phones[i]
+    phone = format_phone_spoken(rng, phone_raw)
     
-    text = random.choice(templates)
-    entities = []
-    
-    name_start = text.find(name)
-    if name_start >= 0:
-        entities.append({"start": name_start, "end": name_start + len(name), "label": "PERSON_NAME"})
-    
-    phone_start = text.find(phone)
-    if phone_start >= 0:
-        entities.append({"start": phone_start, "end": phone_start + len(phone), "label": "PHONE"})
-    
-    return {"text": text, "entities": entities}
+    return render_template(rng.choice(NAME_PHONE_TEMPLATES), {"PERSON_NAME": name, "PHONE": phone})
 
-def gen_name_email() -> Dict:
+def gen_name_email(rng: random.Random, draws: ShardDraws, i: int) -> Tuple[str, List[Dict]]:
     """Generate: name + email"""
-    first = random.choice(FIRST_NAMES)
-    last = random.choice(LAST_NAMES)
+    first = draws.first_names[i]
+    last = draws.last_names[i]
     name = f"{first} {last}"
-    email_raw = generate_email(first, last)
-    email = format_email_spoken(email_raw)
-    
-    templates = [
-        f"email id of {name} is {email}",
-        f"my name is {name} and my email is {email}",
-        f"i am {name} please send mail to {email}",
-        f"this is {name} email me at {email}",
-        f"contact {name} at {email} for details",
-    ]
+    email_raw = generate_email(rng, first, last)
+    email = format_email_spoken(rng, email_raw)
     
-    text = random.choice(templates)
-    entities = []
-    
-    name_start = text.find(name)
-    if name_start >= 0:
-        entities.append({"start": name_start, "end": name_start + len(name), "label": "PERSON_NAME"})
-    
-    email_start = text.find(email)
-    if email_start >= 0:
-        entities.append({"start": email_start, "end": email_start + len(email), "label": "EMAIL"})
-    
-    return {"text": text, "entities": entities}
+    return render_template(rng.choice(NAME_EMAIL_TEMPLATES), {"PERSON_NAME": name, "EMAIL": email})
 
-def gen_name_city_date() -> Dict:
+def gen_name_city_date(rng: random.Random, draws: ShardDraws, i: int) -> Tuple[str, List[Dict]]:
     """Generate: name + city + date (travel)"""
-    first = random.choice(FIRST_NAMES)
-    last = random.choice(LAST_NAMES)
+    first = draws.first_names[i]
+    last = draws.last_names[i]
     name = f"{first} {last}"
-    city = random.choice(CITIES)
-    day, month, year = generate_date()
-    date = format_date_spoken(day, month, year)
-    
-    templates = [
-        f"i am {name} travelling to {city} on {date}",
-        f"this is {name} i will be in {city} on {date}",
-        f"my name is {name} booking flight to {city} for {date}",
-        f"hello {name} here need hotel in {city} on {date}",
-        f"{name} planning visit to {city} around {date}",
-    ]
-    
-    text = random.choice(templates)
-    entities = []
-    
-    name_start = text.find(name)
-    if name_start >= 0:
-        entities.append({"start": name_start, "end": name_start + len(name), "label": "PERSON_NAME"})
-    
-    city_start = text.find(city)
-    if city_start >= 0:
-        entities.append({"start": city_start, "end": city_start + len(city), "label": "CITY"})
-    
-    date_start = text.find(date)
-    if date_start >= 0:
-        entities.append({"start": date_start, "end": date_start + len(date), "label": "DATE"})
+    city = draws.cities[i]
+    day, month, year = generate_date(rng)
+    date = format_date_spoken(rng, day, month, year)
     
-    return {"text": text, "entities": entities}
+    return render_template(rng.choice(NAME_CITY_DATE_TEMPLATES), {
+        "PERSON_NAME": name, "CITY": city, "DATE": date,
+    })
 
-def gen_credit_card() -> Dict:
+def gen_credit_card(rng: random.Random, draws: ShardDraws, i: int) -> Tuple[str, List[Dict]]:
     """Generate: name + credit card + optional date/email"""
-    first = random.choice(FIRST_NAMES)
-    last = random.choice(LAST_NAMES)
+    first = draws.first_names[i]
+    last = draws.last_names[i]
     name = f"{first} {last}"
-    cc_raw = generate_credit_card()
-    cc = format_credit_card_spoken(cc_raw)
-    city = random.choice(CITIES)
-    
-    day, month, year = generate_date()
-    date = format_date_spoken(day, month, year)
-    
-    email_raw = generate_email(first, last)
-    email = format_email_spoken(email_raw)
-    
-    templates = [
-        f"my name is {name} i am from {city} my credit card number is {cc} and it expires on {date} you can email me on {email}",
-        f"this is {name} my card number is {cc} expiry {date}",
-        f"i am {name} please charge card {cc} thanks",
-        f"hello {name} here credit card {cc} for payment",
-        f"card details for {name} number {cc} valid till {date}",
-    ]
-    
-    text = random.choice(templates)
-    entities = []
+    cc_raw = draws.credit_cards[i]
+    cc = format_credit_card_spoken(rng, cc_raw)
+    city = draws.cities[i]
+    values = {"PERSON_NAME": name, "CITY": city, "CREDIT_CARD": cc}
     
-    name_start = text.find(name)
-    if name_start >= 0:
-        entities.append({"start": name_start, "end": name_start + len(name), "label": "PERSON_NAME"})
+    # Date and email are optional: only build them if the template uses them
+    template = rng.choice(CREDIT_CARD_TEMPLATES)
+    slots = template_slots(template)
     
-    if city in text:
-        city_start = text.find(city)
-        if city_start >= 0:
-            entities.append({"start": city_start, "end": city_start + len(city), "label": "CITY"})
+    if "DATE" in slots:
+        day, month, year = generate_date(rng)
+        values["DATE"] = format_date_spoken(rng, day, month, year)
     
-    cc_start = text.find(cc)
-    if cc_start >= 0:
-        entities.append({"start": cc_start, "end": cc_start + len(cc), "label": "CREDIT_CARD"})
+    if "EMAIL" in slots:
+        email_raw = generate_email(rng, first, last)
+        values["EMAIL"] = format_email_spoken(rng, email_raw)
     
-    if date in text:
-        date_start = text.find(date)
-        if date_start >= 0:
-            entities.append({"start": date_start, "end": date_start + len(date), "label": "DATE"})
-    
-    if email in text:
-        email_start = text.find(email)
-        if email_start >= 0:
-            entities.append({"start": email_start, "end": email_start + len(email), "label": "EMAIL"})
-    
-    return {"text": text, "entities": entities}
+    return render_template(template, values)
 
-def gen_location_city() -> Dict:
+def gen_location_city(rng: random.Random, draws: ShardDraws, i: int) -> Tuple[str, List[Dict]]:
     """Generate: location + city"""
-    location = random.choice(LOCATIONS)
-    city = random.choice(CITIES)
-    
-    templates = [
-        f"the office is near {location} in {city} today",
-        f"i live in {location} area of {city}",
-        f"our branch is at {location} in {city}",
-        f"meeting point is {location} in {city} tomorrow",
-        f"address is {location} {city} please note",
-    ]
+    location = draws.locations[i]
+    city = draws.cities[i]
     
-    text = random.choice(templates)
-    entities = []
-    
-    loc_start = text.find(location)
-    if loc_start >= 0:
-        entities.append({"start": loc_start, "end": loc_start + len(location), "label": "LOCATION"})
-    
-    city_start = text.find(city)
-    if city_start >= 0:
-        entities.append({"start": city_start, "end": city_start + len(city), "label": "CITY"})
-    
-    return {"text": text, "entities": entities}
+    return render_template(rng.choice(LOCATION_CITY_TEMPLATES), {"LOCATION": location, "CITY": city})
 
-def gen_name_location_city() -> Dict:
+def gen_name_location_city(rng: random.Random, draws: ShardDraws, i: int) -> Tuple[str, List[Dict]]:
     """Generate: name + location + city"""
-    first = random.choice(FIRST_NAMES)
-    last = random.choice(LAST_NAMES)
+    first = draws.first_names[i]
+    last = draws.last_names[i]
     name = f"{first} {last}"
-    location = random.choice(LOCATIONS)
-    city = random.choice(CITIES)
-    
-    templates = [
-        f"my name is {name} i work in {location} in {city}",
-        f"this is {name} from {location} area {city}",
-        f"i am {name} my office is in {location} {city}",
-        f"hello {name} here based in {location} near {city}",
-    ]
+    location = draws.locations[i]
+    city = draws.cities[i]
     
-    text = random.choice(templates)
-    entities = []
-    
-    name_start = text.find(name)
-    if name_start >= 0:
-        entities.append({"start": name_start, "end": name_start + len(name), "label": "PERSON_NAME"})
-    
-    loc_start = text.find(location)
-    if loc_start >= 0:
-        entities.append({"start": loc_start, "end": loc_start + len(location), "label": "LOCATION"})
-    
-    city_start = text.find(city)
-    if city_start >= 0:
-        entities.append({"start": city_start, "end": city_start + len(city), "label": "CITY"})
-    
-    return {"text": text, "entities": entities}
+    return render_template(rng.choice(NAME_LOCATION_CITY_TEMPLATES), {
+        "PERSON_NAME": name, "LOCATION": location, "CITY": city,
+    })
 
-def gen_negative() -> Dict:
+def gen_negative(rng: random.Random, draws: ShardDraws, i: int) -> Tuple[str, List[Dict]]:
     """Generate: no entities (negative examples)"""
-    phrases = [
-        "tomorrow problem delivery please information payment issue update balance complaint resolve checking plan status yesterday",
-        "complaint order tomorrow ticket feedback please support balance issue today",
-        "soon status fast help ticket plan problem service support please checking payment balance complaint tomorrow",
-        "yes i need help with my order it is delayed",
-        "please check my account balance and update status",
-        "i want to cancel my subscription immediately",
-        "when will my delivery arrive please update",
-        "the service is not working properly please help",
-        "i have a complaint about recent transaction",
-        "need to speak with customer support urgently",
-        "my package was damaged during shipping",
-        "please refund my money as soon as possible",
-        "the product quality is not as expected",
-        "i want to change my plan to premium",
-        "how do i reset my password please help",
-        "the app is crashing every time i open it",
-        "i need invoice for my recent purchase",
-        "when is the sale starting this month",
-        "please transfer me to billing department",
-        "i have been waiting for thirty minutes already",
-    ]
-    return {"text": random.choice(phrases), "entities": []}
+    return rng.choice(NEGATIVE_PHRASES), []
 
-def gen_hinglish_style() -> Dict:
+def gen_hinglish_style(rng: random.Random, draws: ShardDraws, i: int) -> Tuple[str, List[Dict]]:
     """Generate: Hinglish/code-mixed style (stress test)"""
-    first = random.choice(FIRST_NAMES)
-    last = random.choice(LAST_NAMES)
+    first = draws.first_names[i]
+    last = draws.last_names[i]
     name = f"{first} {last}"
-    city = random.choice(CITIES)
-    day, month, year = generate_date()
-    date = format_date_spoken(day, month, year)
-    
-    templates = [
-        f"haan so my naam is {name} and main rehte in {city} we will meet on {date}",
-        f"arey mera name {name} hai aur main {city} mein hoon milte hain {date}",
-        f"dekhiye {name} bol raha hoon {city} se call kar raha hoon {date} ko milenge",
-        f"hello ji {name} this side from {city} lets connect on {date}",
-    ]
-    
-    text = random.choice(templates)
-    entities = []
-    
-    name_start = text.find(name)
-    if name_start >= 0:
-        entities.append({"start": name_start, "end": name_start + len(name), "label": "PERSON_NAME"})
-    
-    city_start = text.find(city)
-    if city_start >= 0:
-        entities.append({"start": city_start, "end": city_start + len(city), "label": "CITY"})
+    city = draws.cities[i]
+    day, month, year = generate_date(rng)
+    date = format_date_spoken(rng, day, month, year)
     
-    date_start = text.find(date)
-    if date_start >= 0:
-        entities.append({"start": date_start, "end": date_start + len(date), "label": "DATE"})
-    
-    return {"text": text, "entities": entities}
+    return render_template(rng.choice(HINGLISH_TEMPLATES), {
+        "PERSON_NAME": name, "CITY": city, "DATE": date,
+    })
 
-def gen_complex_cc_phone_email() -> Dict:
+def gen_complex_cc_phone_email(rng: random.Random, draws: ShardDraws, i: int) -> Tuple[str, List[Dict]]:
     """Generate: complex with CC + phone + email (stress test)"""
-    cc_raw = generate_credit_card()
-    cc = format_credit_card_spoken(cc_raw)
-    phone_raw = generate_phone()
-    phone = format_phone_spoken(phone_raw)
-    
-    first = random.choice(FIRST_NAMES)
-    last = random.choice(LAST_NAMES)
-    email_raw = generate_email(first, last)
-    email = format_email_spoken(email_raw)
-    
-    templates = [
-        f"uh actually my old card number maybe is {cc} i am not sure and my new phone is {phone} also send email to {email} please",
-        f"card number is {cc} phone {phone} email {email} please process",
-        f"details are card {cc} mobile {phone} mail {email} thanks",
-    ]
-    
-    text = random.choice(templates)
-    entities = []
-    
-    cc_start = text.find(cc)
-    if cc_start >= 0:
-        entities.append({"start": cc_start, "end": cc_start + len(cc), "label": "CREDIT_CARD"})
-    
-    phone_start = text.find(phone)
-    if phone_start >= 0:
-        entities.append({"start": phone_start, "end": phone_start + len(phone), "label": "PHONE"})
+    cc_raw = draws.credit_cards[i]
+    cc = format_credit_card_spoken(rng, cc_raw)
+    phone_raw = draws.phones[i]
+    phone = format_phone_spoken(rng, phone_raw)
     
-    email_start = text.find(email)
-    if email_start >= 0:
-        entities.append({"start": email_start, "end": email_start + len(email), "label": "EMAIL"})
+    first = draws.first_names[i]
+    last = draws.last_names[i]
+    email_raw = generate_email(rng, first, last)
+    email = format_email_spoken(rng, email_raw)
     
-    return {"text": text, "entities": entities}
+    return render_template(rng.choice(COMPLEX_CC_PHONE_EMAIL_TEMPLATES), {
+        "CREDIT_CARD": cc, "PHONE": phone, "EMAIL": email,
+    })
 
-def gen_order_id_negative() -> Dict:
+def gen_order_id_negative(rng: random.Random, draws: ShardDraws, i: int) -> Tuple[str, List[Dict]]:
     """Generate: contains numbers but not PII (negative)"""
-    order_id = random.randint(100000, 999999)
-    templates = [
-        f"this is regarding order id {order_id} and i checked it two three times already",
-        f"my order number is {order_id} please check status",
-        f"reference number {order_id} for complaint",
-        f"ticket id {order_id} still not resolved",
-        f"booking reference {order_id} please confirm",
-    ]
-    return {"text": random.choice(templates), "entities": []}
+    order_id = rng.randint(100000, 999999)
+    return rng.choice(ORDER_ID_TEMPLATES).format(order_id=order_id), []
 
 # ============ MAIN GENERATOR ============
 
-def generate_dataset(n_samples: int, include_stress: bool = False) -> List[Dict]:
-    """Generate a dataset with n_samples."""
+# Samples per shard. Shards are the unit of parallelism and each one gets its
+# own seed, so the output depends only on the seed and shard size, never on
+# the number of workers.
+SHARD_SIZE = 5000
+
+def _get_generators(include_stress: bool) -> List[Tuple[Callable[[random.Random, ShardDraws, int], Tuple[str, List[Dict]]], float]]:
+    """Return (generator, weight) pairs."""
     generators = [
         (gen_full_info, 0.20),
         (gen_name_phone, 0.15),
@@ -589,33 +544,129 @@ def generate_dataset(n_samples: int, include_stress: bool = False) -> List[Dict]
             (gen_complex_cc_phone_email, 0.05),
         ])
     
-    # Normalize weights
-    total_weight = sum(w for _, w in generators)
-    generators = [(g, w/total_weight) for g, w in generators]
-    
-    data = []
-    for i in range(n_samples):
-        # Weighted random selection
-        r = random.random()
-        cumulative = 0
-        selected_gen = generators[0][0]
-        for gen, weight in generators:
-            cumulative += weight
-            if r <= cumulative:
-                selected_gen = gen
-                break
-        
-        sample = selected_gen()
-        # Reorder keys to match original format: id, text, entities
-        ordered_sample = {
-            "id": f"utt_{i:04d}",
-            "text": sample["text"],
-            "entities": sample["entities"]
-        }
-        data.append(ordered_sample)
+    return generators
+
+@lru_cache(maxsize=None)
+def _generator_cdf(include_stress: bool) -> Tuple[Tuple[Callable, ...], List[float]]:
+    """Generators and their cumulative weights, computed once per process."""
+    gen_funcs, weights = zip(*_get_generators(include_stress))
+    return gen_funcs, list(itertools.accumulate(weights))
+
+def _generate_shard(shard_id: int, start: int, count: int, seed: int, id_prefix: str,
+                    include_stress: bool) -> List[Dict]:
+    """Generate samples start..start+count with a shard-private RNG."""
+    rng = random.Random(f"{seed}:{shard_id}")
+    gen_funcs, cum_weights = _generator_cdf(include_stress)
+    
+    # Weighted selection for the whole shard in one call (weights need not sum to 1)
+    selected = rng.choices(gen_funcs, cum_weights=cum_weights, k=count)
+    draws = ShardDraws(rng, count)
+    
+    data = [None] * count
+    for i, gen in enumerate(selected):
+        text, entities = gen(rng, draws, i)
+        data[i] = {"id": f"{id_prefix}_{start + i:04d}", "text": text, "entities": entities}
     
     return data
 
+def _make_executor(workers: int) -> Executor:
+    """Threads on free-threaded (no-GIL) CPython, processes otherwise."""
+    # Shards share no RNG state, so threads scale once the GIL is gone and
+    # skip pickling every shard back to the parent
+    if not getattr(sys, "_is_gil_enabled", lambda: True)():
+        return ThreadPoolExecutor(max_workers=workers)
+    return ProcessPoolExecutor(max_workers=workers)
+
+def _map_shards(fn: Callable, n_samples: int, shard_size: int, workers: Optional[int], *shared):
+    """Run fn(shard_id, start, count, *shared) per shard, yielding results in shard order."""
+    shards = [
+        (shard_id, start, min(shard_size, n_samples - start))
+        for shard_id, start in enumerate(range(0, n_samples, shard_size))
+    ]
+    if not shards:
+        return
+    shard_ids, starts, counts = zip(*shards)
+    n_shards = len(shards)
+    shared_args = [[arg] * n_shards for arg in shared]
+    workers = min(workers or os.cpu_count() or 1, n_shards)
+    
+    if workers == 1:
+        # Not worth spawning workers for a single shard
+        yield from map(fn, shard_ids, starts, counts, *shared_args)
+        return
+    
+    chunksize = max(1, n_shards // (workers * 4))
+    with _make_executor(workers) as executor:
+        # map() yields shards in submission order, keeping ids contiguous
+        yield from executor.map(fn, shard_ids, starts, counts, *shared_args, chunksize=chunksize)
+
+# Serialized bytes held in memory before each write in write_jsonl
+WRITE_CHUNK_BYTES = 4 << 20
+
+def _jsonl_line(sample: Dict) -> bytes:
+    """Encode one sample as a newline-terminated UTF-8 JSON line."""
+    if orjson is not None:
+        return orjson.dumps(sample, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(sample, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+def write_jsonl(path: str, samples: List[Dict]) -> None:
+    """Write samples as JSONL straight to a binary file in ~4 MiB chunks."""
+    buf = bytearray()
+    with open(path, "wb") as f:
+        for sample in samples:
+            buf += _jsonl_line(sample)
+            if len(buf) >= WRITE_CHUNK_BYTES:
+                f.write(buf)
+                buf.clear()
+        f.write(buf)
+
+def _part_path(path: str, shard_id: int) -> str:
+    return f"{path}.part{shard_id}"
+
+def _write_shard(shard_id: int, start: int, count: int, seed: int, id_prefix: str,
+                 include_stress: bool, path: str) -> Dict[str, int]:
+    """Generate one shard into its own part file and return its entity counts."""
+    samples = _generate_shard(shard_id, start, count, seed, id_prefix, include_stress)
+    write_jsonl(_part_path(path, shard_id), samples)
+    return dict(Counter(ent["label"] for sample in samples for ent in sample["entities"]))
+
+def _append_file(dst, src) -> None:
+    """Append all of src to dst, copying in-kernel where os.sendfile allows it."""
+    if hasattr(os, "sendfile") and sys.platform.startswith("linux"):
+        size = os.fstat(src.fileno()).st_size
+        offset = 0
+        while offset < size:
+            offset += os.sendfile(dst.fileno(), src.fileno(), offset, size - offset)
+    else:
+        shutil.copyfileobj(src, dst)
+
+def write_dataset(path: str, n_samples: int, id_prefix: str = "utt", include_stress: bool = False,
+                  seed: int = 42, workers: Optional[int] = None, shard_size: int = SHARD_SIZE) -> Dict[str, int]:
+    """Generate a dataset straight to a JSONL file and return its entity counts.
+    
+    Each worker serializes and writes its own shard; the parent only
+    concatenates the part files in shard order.
+    """
+    entity_counts = Counter()
+    n_parts = 0
+    try:
+        for shard_counts in _map_shards(_write_shard, n_samples, shard_size, workers,
+                                           seed, id_prefix, include_stress, path):
+            entity_counts.update(shard_counts)
+            n_parts += 1
+        
+        with open(path, "wb") as out:
+            for shard_id in range(n_parts):
+                with open(_part_path(path, shard_id), "rb") as src:
+                    _append_file(out, src)
+    finally:
+        for shard_id in range(-(-n_samples // shard_size)):
+            part = _part_path(path, shard_id)
+            if os.path.exists(part):
+                os.remove(part)
+    
+    return dict(entity_counts)
+
 def main():
     parser = argparse.ArgumentParser(description="Generate PII NER training data")
     parser.add_argument("--train_samples", type=int, default=1000, help="Number of training samples")
@@ -623,47 +674,33 @@ def main():
     parser.add_argument("--train_output", default="data/train_generated.jsonl")
     parser.add_argument("--dev_output", default="data/dev_generated.jsonl")
     parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--shard_size", type=int, default=SHARD_SIZE, help="Samples per worker shard")
     args = parser.parse_args()
-    
-    random.seed(args.seed)
-    
+    if args.shard_size < 1:
+        parser.error("--shard_size must be at least 1")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+
     # Generate training data
     print(f"Generating {args.train_samples} training samples...")
-    train_data = generate_dataset(args.train_samples, include_stress=True)
-    
-    with open(args.train_output, "w", encoding="utf-8") as f:
-        for sample in train_data:
-            f.write(json.dumps(sample, ensure_ascii=False) + "\n")
+    train_counts = write_dataset(args.train_output, args.train_samples, id_prefix="utt", include_stress=True,
+                                 seed=args.seed, workers=args.workers, shard_size=args.shard_size)
     print(f"Saved to {args.train_output}")
     
     # Generate dev data with different seed
-    random.seed(args.seed + 1000)
     print(f"Generating {args.dev_samples} dev samples...")
-    dev_data = generate_dataset(args.dev_samples, include_stress=True)
-    
-    # Renumber IDs for dev
-    for i, sample in enumerate(dev_data):
-        dev_data[i] = {
-            "id": f"dev_{i:04d}",
-            "text": sample["text"],
-            "entities": sample["entities"]
-        }
-    
-    with open(args.dev_output, "w", encoding="utf-8") as f:
-        for sample in dev_data:
-            f.write(json.dumps(sample, ensure_ascii=False) + "\n")
+    dev_counts = write_dataset(args.dev_output, args.dev_samples, id_prefix="dev", include_stress=True,
+                               seed=args.seed + 1000, workers=args.workers, shard_size=args.shard_size)
     print(f"Saved to {args.dev_output}")
     
     # Print stats
     print("\n--- Statistics ---")
-    for name, data in [("Train", train_data), ("Dev", dev_data)]:
-        entity_counts = {}
-        for sample in data:
-            for ent in sample["entities"]:
-                entity_counts[ent["label"]] = entity_counts.get(ent["label"], 0) + 1
-        print(f"{name}: {len(data)} samples")
+    for name, n_samples, entity_counts in [("Train", args.train_samples, train_counts),
+                                           ("Dev", args.dev_samples, dev_counts)]:
+        print(f"{name}: {n_samples} samples")
         for label, count in sorted(entity_counts.items()):
             print(f"  {label}: {count}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
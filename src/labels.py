@@ -1,3 +1,5 @@
+import numpy as np
+
 LABELS = [
     "O",
     "B-CREDIT_CARD", "I-CREDIT_CARD",
@@ -21,6 +23,14 @@ LABEL2ID = {label: i for i, label in enumerate(LABELS)}
 LABEL_TO_ID = LABEL2ID  # Alias for compatibility
 ID2LABEL = {i: label for label, i in LABEL2ID.items()}
 
+# Parallel arrays indexed by label id, so decoders never split label strings
+ENTITY_TYPES = sorted({label.split("-", 1)[1] for label in LABELS if label != "O"})
+LABEL_IS_B = np.array([label.startswith("B-") for label in LABELS])
+# Index into ENTITY_TYPES, -1 for O
+LABEL_ENTITY_ID = np.array([
+    ENTITY_TYPES.index(label.split("-", 1)[1]) if label != "O" else -1 for label in LABELS
+])
+
 
 def label_is_pii(label: str) -> bool:
     return label in PII_LABELS
\ No newline at end of file
@@ -1,70 +1,246 @@
 import json
 import argparse
+import numpy as np
 import torch
 from transformers import AutoTokenizer, AutoModelForTokenClassification
-from labels import ID2LABEL, label_is_pii
+from labels import ENTITY_TYPES, LABEL_ENTITY_ID, LABEL_IS_B, label_is_pii
 import os
+from concurrent.futures import ThreadPoolExecutor
 
+try:
+    import orjson
+except ImportError:  # optional, only speeds up (de)serialization
+    orjson = None
 
-def bio_to_spans(text, offsets, label_ids, logits=None, confidence_threshold=0.1):
+
+# Mixed-precision dtypes selectable with --dtype; None runs in full fp32
+AUTOCAST_DTYPES = {"fp32": None, "fp16": torch.float16, "bf16": torch.bfloat16}
+
+
+def bio_to_spans(text, offsets, label_ids, confidences=None, confidence_threshold=0.1):
     """
     Convert BIO tags to spans with optional confidence filtering for PII entities.
-    
+
+    Span boundaries are found with array ops rather than a per-token loop: a
+    span opens on a B- tag or on an I- tag whose entity differs from the
+    previous token's, and runs until the next opening or O tag.
+
     Args:
         text: Original text
         offsets: Token offset mappings
         label_ids: Predicted label IDs
-        logits: Probability logits (optional, for confidence-based filtering)
+        confidences: Per-token probability of the predicted label (optional, for confidence-based filtering)
         confidence_threshold: Minimum confidence for PII entities (0-1)
+
+    Returns:
+        List of (start, end, label, confidence) tuples, confidence being the
+        minimum over the span's tokens
+    """
+    offsets = np.asarray(offsets).reshape(-1, 2)
+    label_ids = np.asarray(label_ids).astype(np.int64, copy=False)
+    conf = np.ones(len(label_ids)) if confidences is None else np.asarray(confidences, dtype=np.float64)
+
+    # Drop special and padding tokens, which have (0, 0) offsets
+    keep = (offsets[:, 0] != 0) | (offsets[:, 1] != 0)
+    offsets, label_ids, conf = offsets[keep], label_ids[keep], conf[keep]
+
+    ent = LABEL_ENTITY_ID[label_ids]
+    prev_ent = np.concatenate(([-1], ent[:-1]))
+    inside = ent >= 0
+    opens = inside & (LABEL_IS_B[label_ids] | (ent != prev_ent))
+
+    # Tokens inside a span, tagged with the index of the span they belong to
+    members = np.flatnonzero(inside)
+    if not len(members):
+        return []
+    span_of = np.cumsum(opens)[members]
+    first = np.concatenate(([True], span_of[1:] != span_of[:-1]))
+    last = np.concatenate((span_of[1:] != span_of[:-1], [True]))
+    span_conf = np.minimum.reduceat(conf[members], np.flatnonzero(first))
+
+    starts = offsets[members[first], 0].tolist()
+    ends = offsets[members[last], 1].tolist()
+    labels = [ENTITY_TYPES[e] for e in ent[members[first]]]
+    return list(zip(starts, ends, labels, span_conf.tolist()))
+
+
+def load_model(model_dir):
+    """
+    Load the model with fused scaled_dot_product_attention, falling back to
+    BetterTransformer on transformers releases without attn_implementation.
+    """
+    try:
+        return AutoModelForTokenClassification.from_pretrained(model_dir, attn_implementation="sdpa")
+    except (TypeError, ValueError) as exc:  # transformers<4.36, or no SDPA port for this architecture
+        model = AutoModelForTokenClassification.from_pretrained(model_dir)
+        try:
+            return model.to_bettertransformer()
+        except Exception:
+            print(f"SDPA attention unavailable, using eager attention: {exc}")
+            return model
+
+
+def compile_model(model, device):
+    """
+    torch.compile the model, falling back to eager where it is unavailable.
+
+    Compilation is lazy, so a small warm-up batch is run here: backend and
+    C++ toolchain failures surface on that first call, not in torch.compile.
+    """
+    # CUDA graphs cut launch overhead on GPU; on CPU the default mode already
+    # fuses the elementwise epilogues without max-autotune's long warmup
+    mode = "reduce-overhead" if torch.device(device).type == "cuda" else "default"
+    try:
+        compiled = torch.compile(model, mode=mode, dynamic=True)
+        input_ids = torch.zeros((2, 8), dtype=torch.long, device=device)
+        with torch.inference_mode():
+            compiled(input_ids, torch.ones_like(input_ids))
+        return compiled
+    except Exception as exc:  # torch<2.0, no compiler backend, or a broken toolchain
+        print(f"torch.compile unavailable, running eager: {exc}")
+        return model
+
+
+def trace_model(model, device, batch_size, max_length):
+    """TorchScript the model with torch.jit.trace, freeze it and optimize it for inference."""
+    # Batch and sequence dims stay dynamic in the traced graph, so the
+    # example shape only has to be representative
+    input_ids = torch.zeros((batch_size, max_length), dtype=torch.long, device=device)
+    attention_mask = torch.ones_like(input_ids)
+    with torch.no_grad():
+        traced = torch.jit.trace(model, (input_ids, attention_mask), strict=False)
+    return torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+
+
+def _dumps(obj):
+    """Encode obj as compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def plan_batches(lengths, max_batch_size, token_budget):
+    """
+    Group item indices into batches of similar token length.
+
+    Items are sorted by length and a batch grows until it holds max_batch_size
+    items or its padded attention cost (batch size * longest length**2) would
+    exceed token_budget, so short utterances share large batches and long ones
+    get small ones. A single item always forms a batch, whatever its cost.
+    """
+    order = sorted(range(len(lengths)), key=lengths.__getitem__)
+    batches, current = [], []
+    for i in order:
+        # Sorted ascending, so the newest item is the longest in the batch
+        cost = (len(current) + 1) * lengths[i] ** 2
+        if current and (len(current) == max_batch_size or cost > token_budget):
+            batches.append(current)
+            current = []
+        current.append(i)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def encode_batches(tokenizer, items, batches, max_length):
+    """
+    Yield (batch, encoding) pairs for each list of item indices in batches.
+
+    The next batch is tokenized on a worker thread while the caller runs the
+    current one; the Rust fast tokenizer releases the GIL while it works.
+    """
+    def encode(batch):
+        return tokenizer(
+            [text for _, text in batch],
+            return_offsets_mapping=True,
+            padding=True,
+            truncation=True,
+            max_length=max_length,
+            return_tensors="pt",
+        )
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pending = None
+        for indices in batches:
+            batch = [items[i] for i in indices]
+            future = pool.submit(encode, batch)
+            if pending is not None:
+                yield pending[0], pending[1].result()
+            pending = (batch, future)
+        if pending is not None:
+            yield pending[0], pending[1].result()
+
+
+def prefetch_to_device(batches, device, capacity):
     """
-    spans = []
-    current_label = None
-    current_start = None
-    current_end = None
-    current_confidence = 1.0
-
-    for idx, ((start, end), lid) in enumerate(zip(offsets, label_ids)):
-        if start == 0 and end == 0:
-            continue
-        label = ID2LABEL.get(int(lid), "O")
-        
-        # Calculate confidence if logits provided
-        if logits is not None:
-            probs = torch.softmax(logits[idx], dim=-1)
-            confidence = probs[int(lid)].item()
-        else:
-            confidence = 1.0
-        
-        if label == "O":
-            if current_label is not None:
-                spans.append((current_start, current_end, current_label, current_confidence))
-                current_label = None
-            continue
-
-        prefix, ent_type = label.split("-", 1)
-        if prefix == "B":
-            if current_label is not None:
-                spans.append((current_start, current_end, current_label, current_confidence))
-            current_label = ent_type
-            current_start = start
-            current_end = end
-            current_confidence = confidence
-        elif prefix == "I":
-            if current_label == ent_type:
-                current_end = end
-                current_confidence = min(current_confidence, confidence)
-            else:
-                if current_label is not None:
-                    spans.append((current_start, current_end, current_label, current_confidence))
-                current_label = ent_type
-                current_start = start
-                current_end = end
-                current_confidence = confidence
-
-    if current_label is not None:
-        spans.append((current_start, current_end, current_label, current_confidence))
-
-    return spans
+    Yield (batch, encoding) pairs with the model inputs already on device.
+
+    On CUDA the next batch is tokenized and copied on a side stream before the
+    current one is handed out, so its H2D transfer overlaps the current
+    forward pass. Copies go through two preallocated slots of pinned host and
+    device buffers holding capacity tokens each, so no batch allocates its own
+    input tensors. Offsets stay on the host.
+    """
+    if torch.device(device).type != "cuda":
+        for batch, enc in batches:
+            yield batch, {**enc, "input_ids": enc["input_ids"].to(device),
+                          "attention_mask": enc["attention_mask"].to(device)}
+        return
+
+    copy_stream = torch.cuda.Stream(device)
+    # One slot computes while the other is filled; the caller syncs on every
+    # batch's results, so a slot is free again by the time it comes round
+    slots = [
+        {key: (torch.empty(capacity, dtype=torch.long, pin_memory=True),
+               torch.empty(capacity, dtype=torch.long, device=device))
+         for key in ("input_ids", "attention_mask")}
+        for _ in range(2)
+    ]
+    pending = None
+    for n, (batch, enc) in enumerate(batches):
+        moved = dict(enc)
+        with torch.cuda.stream(copy_stream):
+            for key, (host, dev) in slots[n % 2].items():
+                src = enc[key]
+                # Contiguous views over the front of each flat buffer
+                staged = host[:src.numel()].view_as(src)
+                staged.copy_(src)
+                moved[key] = dev[:src.numel()].view_as(src)
+                moved[key].copy_(staged, non_blocking=True)
+        copied = torch.cuda.Event()
+        copied.record(copy_stream)
+        if pending is not None:
+            yield _after_copy(*pending)
+        pending = (batch, moved, copied)
+    if pending is not None:
+        yield _after_copy(*pending)
+
+
+def _after_copy(batch, moved, copied):
+    """Make the compute stream wait for one batch's copy before it is used."""
+    torch.cuda.current_stream().wait_event(copied)
+    return batch, moved
+
+
+def load_onnx_session(model_dir, device):
+    """
+    Open an ONNX Runtime session for model_dir, exporting the model on first
+    use and again whenever the saved weights are newer than the export.
+    """
+    import onnxruntime as ort
+
+    onnx_dir = os.path.join(model_dir, "onnx")
+    onnx_path = os.path.join(onnx_dir, "model.onnx")
+    weights = [os.path.join(model_dir, name) for name in ("model.safetensors", "pytorch_model.bin")]
+    if not os.path.exists(onnx_path) or any(
+            os.path.getmtime(w) > os.path.getmtime(onnx_path) for w in weights if os.path.exists(w)):
+        from optimum.exporters.onnx import main_export
+        main_export(model_dir, output=onnx_dir, task="token-classification")
+
+    providers = ["CPUExecutionProvider"]
+    if torch.device(device).type == "cuda":
+        providers.insert(0, "CUDAExecutionProvider")
+    return ort.InferenceSession(onnx_path, providers=providers)
 
 
 def main():
@@ -75,61 +251,137 @@ def main():
     ap.add_argument("--output", default="out/dev_pred.json")
     ap.add_argument("--max_length", type=int, default=256)
     ap.add_argument("--confidence_threshold", type=float, default=0.5)
+    ap.add_argument("--batch_size", type=int, default=32,
+                    help="Upper bound on utterances per batch")
+    ap.add_argument("--token_budget", type=int, default=32 * 128 ** 2,
+                    help="Max batch size * longest sequence length**2 per batch")
+    ap.add_argument("--dtype", choices=sorted(AUTOCAST_DTYPES), default="fp32",
+                    help="Autocast dtype for the forward pass (bf16 suits recent CPUs, fp16 CUDA)")
+    ap.add_argument("--compile", action="store_true",
+                    help="Fuse the encoder with torch.compile (slow first batch, faster after)")
+    ap.add_argument("--onnx", action="store_true",
+                    help="Run the forward pass with ONNX Runtime (exported to <model_dir>/onnx on first use)")
+    ap.add_argument("--jit", action="store_true",
+                    help="Run a traced, frozen TorchScript graph (traced at startup)")
+    ap.add_argument("--quantize", action="store_true",
+                    help="Dynamic int8 quantization of Linear layers (CPU only)")
     ap.add_argument(
         "--device", default="cuda" if torch.cuda.is_available() else "cpu")
     args = ap.parse_args()
+    if args.quantize and torch.device(args.device).type != "cpu":
+        ap.error("--quantize is only supported with --device cpu")
+    if args.jit and (args.compile or args.onnx):
+        ap.error("--jit cannot be combined with --compile or --onnx")
+    # ONNX Runtime runs the exported fp32 graph; the PyTorch-side options never apply
+    if args.onnx and (args.quantize or args.compile or args.dtype != "fp32"):
+        ap.error("--onnx cannot be combined with --quantize, --compile or --dtype other than fp32")
 
     tokenizer = AutoTokenizer.from_pretrained(
         args.model_dir if args.model_name is None else args.model_name)
-    model = AutoModelForTokenClassification.from_pretrained(args.model_dir)
-    model.to(args.device)
-    model.eval()
+    if args.onnx:
+        session = load_onnx_session(args.model_dir, args.device)
+    else:
+        model = load_model(args.model_dir)
+        # Plain tuple outputs; skips building a ModelOutput per batch
+        model.config.return_dict = False
+        model.to(args.device)
+        model.eval()
+        if args.quantize:
+            # int8 weights, activations quantized on the fly per batch
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        if args.compile:
+            model = compile_model(model, args.device)
+        if args.jit:
+            model = trace_model(model, args.device, args.batch_size, args.max_length)
 
-    results = {}
-
-    with open(args.input, "r", encoding="utf-8") as f:
+    # Parse raw bytes; orjson decodes UTF-8 itself
+    loads = json.loads if orjson is None else orjson.loads
+    items = []
+    with open(args.input, "rb") as f:
         for line in f:
-            obj = json.loads(line)
-            text = obj["text"]
-            uid = obj["id"]
-
-            enc = tokenizer(
-                text,
-                return_offsets_mapping=True,
-                truncation=True,
-                max_length=args.max_length,
-                return_tensors="pt",
-            )
-            offsets = enc["offset_mapping"][0].tolist()
-            input_ids = enc["input_ids"].to(args.device)
-            attention_mask = enc["attention_mask"].to(args.device)
-
-            with torch.no_grad():
-                out = model(input_ids=input_ids, attention_mask=attention_mask)
-                logits = out.logits[0]
-                pred_ids = logits.argmax(dim=-1).cpu().tolist()
-
-            spans = bio_to_spans(text, offsets, pred_ids, logits=logits, confidence_threshold=args.confidence_threshold)
-            ents = []
-            for s, e, lab, conf in spans:
-                # Apply confidence threshold filtering for PII entities
-                if label_is_pii(lab) and conf < args.confidence_threshold:
-                    continue  # Skip low-confidence PII predictions
-                ents.append(
-                    {
-                        "start": int(s),
-                        "end": int(e),
-                        "label": lab,
-                        "pii": bool(label_is_pii(lab)),
-                    }
-                )
-            results[uid] = ents
+            obj = loads(line)
+            items.append((obj["id"], obj["text"]))
+
+    # Batching similar token lengths together keeps padding waste small
+    lengths = []
+    if items:
+        lengths = [len(ids) for ids in tokenizer(
+            [text for _, text in items], truncation=True, max_length=args.max_length)["input_ids"]]
+    batch_plan = plan_batches(lengths, args.batch_size, args.token_budget)
+    device_type = torch.device(args.device).type
+    if device_type == "cuda":
+        # Let cuDNN pick its fastest kernels once per input shape
+        torch.backends.cudnn.benchmark = True
+    amp_dtype = AUTOCAST_DTYPES[args.dtype]
+    # Confidences only ever filter spans out, and none can fall below a threshold <= 0
+    need_conf = args.confidence_threshold > 0
+
+    batches = encode_batches(tokenizer, items, batch_plan, args.max_length)
+    if not args.onnx:
+        batches = prefetch_to_device(batches, args.device, args.batch_size * args.max_length)
 
+    # Predictions are streamed into one JSON object as each batch finishes
+    # (members in batch order) instead of being held and dumped at the end.
+    # They go to a temp file that replaces the output only once complete, so a
+    # failed run leaves any previous predictions intact.
     os.makedirs(os.path.dirname(args.output), exist_ok=True)
-    with open(args.output, "w", encoding="utf-8") as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+    tmp_path = args.output + ".tmp"
+    n_written = 0
+    try:
+        with open(tmp_path, "wb") as out_f:
+            out_f.write(b"{")
+            for batch, enc in batches:
+                # Already on the host; the decoder consumes the numpy rows directly
+                offsets = enc["offset_mapping"].numpy()
+
+                with torch.inference_mode(), torch.autocast(device_type, dtype=amp_dtype, enabled=amp_dtype is not None):
+                    if args.onnx:
+                        # ONNX Runtime consumes and returns host numpy arrays
+                        feed = {inp.name: enc[inp.name].numpy() for inp in session.get_inputs()}
+                        logits = torch.from_numpy(session.run(["logits"], feed)[0])
+                    else:
+                        logits = model(enc["input_ids"], enc["attention_mask"])[0].float()
+                    top, pred = logits.max(dim=-1)
+                    if need_conf:
+                        # Probability of the argmax label, exp(top - logsumexp), without
+                        # materializing the full softmax
+                        conf = torch.exp(top - torch.logsumexp(logits, dim=-1))
+                        # Single device->host transfer (one sync) for both
+                        pred_ids, confidences = torch.stack((pred.to(conf.dtype), conf)).cpu().numpy()
+                    else:
+                        pred_ids, confidences = pred.cpu().numpy(), None
+
+                for j, (uid, text) in enumerate(batch):
+                    # Padding positions carry (0, 0) offsets and are skipped like special tokens
+                    spans = bio_to_spans(text, offsets[j], pred_ids[j], confidences=None if confidences is None else confidences[j], confidence_threshold=args.confidence_threshold)
+                    ents = []
+                    for s, e, lab, conf in spans:
+                        pii = label_is_pii(lab)
+                        # Apply confidence threshold filtering for PII entities
+                        if pii and conf < args.confidence_threshold:
+                            continue  # Skip low-confidence PII predictions
+                        ents.append(
+                            {
+                                "start": int(s),
+                                "end": int(e),
+                                "label": lab,
+                                "pii": pii,
+                            }
+                        )
+                    if n_written:
+                        out_f.write(b",")
+                    out_f.write(_dumps(uid) + b":" + _dumps(ents))
+                    n_written += 1
+
+            out_f.write(b"}")
+    except BaseException:
+        # open() itself may have failed, leaving nothing (or no file) to clean up
+        if os.path.isfile(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, args.output)
 
-    print(f"Wrote predictions for {len(results)} utterances to {args.output}")
+    print(f"Wrote predictions for {n_written} utterances to {args.output}")
 
 
 if __name__ == "__main__":